@@ -137,6 +137,108 @@ class ProductManager {
         }
     }
 
+    // Cargar una instantánea del catálogo del backend; devuelve su número de secuencia
+    async loadSnapshot() {
+        const response = await fetch(`${WuasiBoxConfig.apiUrl}/productos`);
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+
+        const snapshot = await response.json();
+        this.products = snapshot.productos.map(p => this.fromBackend(p));
+        return snapshot.secuencia;
+    }
+
+    // Suscribirse al feed de cambios del backend (Server-Sent Events)
+    // Primero se toma una instantánea y luego se piden solo los eventos posteriores a su secuencia;
+    // al reconectar el navegador reenvía Last-Event-ID, así que solo llegan los deltas pendientes
+    async subscribeChanges(onChange = () => {}) {
+        if (typeof EventSource === 'undefined') {
+            console.warn('EventSource no disponible, se mantiene la carga completa');
+            return null;
+        }
+
+        let sequence;
+        try {
+            sequence = await this.loadSnapshot();
+        } catch (error) {
+            console.warn('Backend no disponible, se mantienen los datos locales:', error);
+            return null;
+        }
+        onChange({ tipo: 'snapshot' }, this.products);
+
+        return this.openChangeStream(sequence, onChange);
+    }
+
+    // Abrir el stream de eventos a partir de la secuencia de una instantánea ya cargada
+    openChangeStream(sequence, onChange) {
+        const source = new EventSource(`${WuasiBoxConfig.apiUrl}/cambios?desde=${sequence}`);
+        const types = ['insert', 'update', 'delete', 'stock_bajo', 'stock_repuesto'];
+
+        types.forEach(type => {
+            source.addEventListener(type, (e) => {
+                const change = JSON.parse(e.data);
+                this.applyChange(change);
+                onChange(change, this.products);
+            });
+        });
+
+        // El servidor ya no tiene los eventos pedidos: cerrar el stream para que ningún delta
+        // se pierda bajo la nueva instantánea, recargarla y reabrir desde su secuencia
+        const resync = async () => {
+            try {
+                const snapshotSequence = await this.loadSnapshot();
+                onChange({ tipo: 'reset' }, this.products);
+                this.openChangeStream(snapshotSequence, onChange);
+            } catch (error) {
+                console.error('Error al recargar el catálogo, reintentando:', error);
+                setTimeout(resync, 5000);
+            }
+        };
+
+        source.addEventListener('reset', () => {
+            source.close();
+            resync();
+        });
+
+        this.changeSource = source;
+        return source;
+    }
+
+    // Aplicar un delta recibido del feed a la lista local
+    applyChange(change) {
+        const product = this.fromBackend(change.producto);
+        const index = this.products.findIndex(p => p.code === change.codigo);
+
+        if (change.tipo === 'delete') {
+            if (index !== -1) this.products.splice(index, 1);
+        } else if (index === -1) {
+            this.products.push(product);
+        } else {
+            this.products[index] = { ...this.products[index], ...product };
+        }
+    }
+
+    // Convertir un producto del backend Python al formato del frontend
+    fromBackend(producto) {
+        return {
+            id: producto.codigo,
+            code: producto.codigo,
+            name: producto.nombre,
+            category: producto.categoria,
+            brand: producto.marca,
+            price: producto.precio_venta,
+            cost: producto.precio_compra,
+            stock: producto.stock,
+            minStock: producto.stock_minimo,
+            supplier: producto.proveedor,
+            location: producto.ubicacion,
+            description: producto.descripcion,
+            updatedAt: producto.fecha_modificacion || producto.fecha_registro,
+            status: producto.estado === 'Activo' ? 'active' : 'inactive'
+        };
+    }
+
     // Buscar productos
     searchProducts(filters = {}) {
         let results = [...this.products];
@@ -203,6 +305,16 @@ class ProductManager {
         };
     }
 
+    // Indicadores de inventario con los mismos criterios del backend Python:
+    // valor = precio de compra * stock, y stock crítico cuando stock <= stock mínimo
+    getInventoryKpis() {
+        return {
+            totalProducts: this.products.length,
+            totalValue: this.products.reduce((sum, p) => sum + ((p.cost || 0) * p.stock), 0),
+            criticalProducts: this.products.filter(p => p.stock <= p.minStock).length
+        };
+    }
+
     // Métodos auxiliares
     validateProduct(product) {
         const requiredFields = ['name', 'category', 'price', 'stock', 'minStock'];
@@ -1054,5 +1166,3 @@ if (typeof window !== 'undefined') {
         Utils: WuasiBoxUtils
     };
 }
-
-export { ProductManager, FormHandler, DataTable, WuasiBoxUtils };
\ No newline at end of file
@@ -6,17 +6,112 @@ Versión: 3.0 Professional
 """
 
 import os
+import sys
 import json
 import csv
+import io
+import threading
+import time
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import Dict, List, Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+
+class FeedCambios:
+    """Feed de cambios del catálogo con números de secuencia crecientes"""
+
+    def __init__(self, capacidad: int = 1000):
+        """Inicializa el buffer circular de eventos"""
+        self.eventos = deque(maxlen=capacidad)
+        self.secuencia = 0
+        self.condicion = threading.Condition()
+
+    def publicar(self, tipo: str, producto: Dict) -> Dict:
+        """Publica un evento (insert, update, delete, stock_bajo, stock_repuesto)"""
+        with self.condicion:
+            self.secuencia += 1
+            evento = {
+                'id': self.secuencia,
+                'tipo': tipo,
+                'codigo': producto.get('codigo'),
+                'producto': dict(producto),
+                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+            self.eventos.append(evento)
+            self.condicion.notify_all()
+        return evento
+
+    def eventos_desde(self, ultimo_id: int) -> Optional[List[Dict]]:
+        """Devuelve los eventos posteriores a ultimo_id, o None si ya no están en el buffer"""
+        with self.condicion:
+            if ultimo_id > self.secuencia:
+                return None
+            if self.eventos and ultimo_id < self.eventos[0]['id'] - 1:
+                return None
+            if not self.eventos and ultimo_id < self.secuencia:
+                return None
+            return [e for e in self.eventos if e['id'] > ultimo_id]
+
+    def esperar(self, ultimo_id: int, timeout: float = 15.0) -> bool:
+        """Bloquea hasta que exista un evento posterior a ultimo_id o venza el timeout"""
+        with self.condicion:
+            return self.condicion.wait_for(lambda: self.secuencia > ultimo_id, timeout)
+
+
+class CacheReportes:
+    """Caché LRU de reportes indexada por tipo, parámetros y versión de datos"""
+
+    def __init__(self, capacidad: int = 32):
+        """Inicializa la caché con un límite de entradas"""
+        self.capacidad = capacidad
+        self.entradas = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self.lock = threading.Lock()
+
+    def obtener(self, tipo: str, parametros: Tuple, version: int, calcular: Callable):
+        """Devuelve el resultado memorizado o lo calcula y lo guarda"""
+        clave = (tipo, parametros, version)
+        with self.lock:
+            if clave in self.entradas:
+                self.entradas.move_to_end(clave)
+                self.aciertos += 1
+                return self.entradas[clave]
+            self.fallos += 1
+
+        resultado = calcular()
+
+        with self.lock:
+            self.entradas[clave] = resultado
+            self.entradas.move_to_end(clave)
+            while len(self.entradas) > self.capacidad:
+                self.entradas.popitem(last=False)
+        return resultado
+
+    def estadisticas(self) -> Dict:
+        """Devuelve los contadores de aciertos y fallos"""
+        with self.lock:
+            return {
+                'entradas': len(self.entradas),
+                'capacidad': self.capacidad,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos
+            }
+
 
 class SistemaEmbalajes:
     def __init__(self):
         """Inicializa el sistema con configuración profesional"""
         self.archivo_datos = "productos.json"
         self.archivo_log = "sistema_log.txt"
+        self.version_datos = 0
+        self.lock_version = threading.Lock()
+        self.lock_escritura = threading.RLock()
+        self.cache_reportes = CacheReportes()
         self.productos = self.cargar_datos()
+        self.feed = FeedCambios()
         self.categorias = [
             "Cintas Transparentes",
             "Envoplast",
@@ -28,6 +123,7 @@ class SistemaEmbalajes:
             "Material de Protección"
         ]
         self.unidades_medida = ["Rollos", "Unidades", "Metros", "Kilos", "Cajas"]
+        self.campos_numericos_lote = ['precio_compra', 'precio_venta', 'stock', 'stock_minimo']
         
     def log_accion(self, accion: str, usuario: str = "Sistema"):
         """Registra acciones en el log del sistema"""
@@ -52,17 +148,87 @@ class SistemaEmbalajes:
             self.log_accion(f"Error al cargar datos: {str(e)}")
         return []
     
-    def guardar_datos(self) -> bool:
-        """Guarda los productos en el archivo JSON"""
+    def instantanea(self) -> Tuple[int, List[Dict]]:
+        """
+        Devuelve (version, productos) como vista estable del catálogo.
+        
+        La lista y sus registros nunca se modifican después de publicarse: los escritores
+        publican una lista nueva, así que el lector puede recorrerla sin bloqueos. Las
+        versiones antiguas se liberan cuando ninguna instantánea las referencia.
+        """
+        with self.lock_version:
+            return self.version_datos, self.productos
+    
+    def publicar_productos(self, productos: List[Dict]):
+        """Publica una nueva versión del catálogo (copy-on-write) e invalida los reportes memorizados"""
+        with self.lock_version:
+            self.productos = productos
+            self.version_datos += 1
+    
+    def confirmar_productos(self, productos: List[Dict]) -> bool:
+        """
+        Guarda una versión candidata del catálogo y solo si se guardó la publica.
+        
+        Los lectores nunca ven una versión que luego se descarte por un error de guardado.
+        Debe llamarse con lock_escritura adquirido.
+        """
+        if not self.guardar_datos(productos):
+            return False
+        self.publicar_productos(productos)
+        return True
+    
+    def reemplazar_producto(self, original: Dict, nuevo: Dict) -> Optional[List[Dict]]:
+        """
+        Devuelve una copia del catálogo con `original` reemplazado por `nuevo`, sin publicarla.
+        
+        Devuelve None si `original` ya no es el registro publicado
+        (otro escritor lo modificó o eliminó desde que se leyó).
+        """
+        with self.lock_escritura:
+            productos = self.productos
+            for i, producto in enumerate(productos):
+                if producto is original:
+                    nuevos = list(productos)
+                    nuevos[i] = nuevo
+                    return nuevos
+            return None
+    
+    def guardar_datos(self, productos: Optional[List[Dict]] = None) -> bool:
+        """Guarda los productos (por defecto, la versión publicada) en el archivo JSON"""
+        if productos is None:
+            _, productos = self.instantanea()
+        
+        # Se escribe en un temporal y se reemplaza: un fallo no deja el archivo a medias
+        temporal = f"{self.archivo_datos}.tmp"
         try:
-            with open(self.archivo_datos, 'w', encoding='utf-8') as f:
-                json.dump(self.productos, f, indent=4, ensure_ascii=False, default=str)
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(productos, f, indent=4, ensure_ascii=False, default=str)
+            os.replace(temporal, self.archivo_datos)
             self.log_accion("Datos guardados exitosamente")
             return True
         except Exception as e:
             self.log_accion(f"Error al guardar datos: {str(e)}")
+            if os.path.exists(temporal):
+                os.remove(temporal)
             return False
     
+    def stock_bajo(self, producto: Dict) -> bool:
+        """Indica si el producto está en o por debajo de su stock mínimo"""
+        return producto.get('stock', 0) <= producto.get('stock_minimo', 0)
+    
+    def publicar_cambio(self, tipo: str, producto: Dict, estaba_bajo: Optional[bool] = None):
+        """Publica un cambio en el feed y, si cruzó el umbral de stock, la alerta correspondiente"""
+        self.feed.publicar(tipo, producto)
+        if tipo == 'delete':
+            return
+        
+        esta_bajo = self.stock_bajo(producto)
+        if estaba_bajo is None:
+            if esta_bajo:
+                self.feed.publicar('stock_bajo', producto)
+        elif esta_bajo != estaba_bajo:
+            self.feed.publicar('stock_bajo' if esta_bajo else 'stock_repuesto', producto)
+    
     def limpiar_pantalla(self):
         """Limpia la pantalla de la consola"""
         os.system('cls' if os.name == 'nt' else 'clear')
@@ -201,15 +367,24 @@ class SistemaEmbalajes:
         # Ubicación en almacén
         nuevo_producto['ubicacion'] = input("Ubicación en almacén (ej: A-12-B3): ").strip()
         
-        self.productos.append(nuevo_producto)
+        with self.lock_escritura:
+            # El código se generó antes de tomar el lock: otro escritor pudo haberlo usado
+            if any(p['codigo'] == codigo for p in self.productos):
+                codigo = self.generar_codigo_producto(categoria)
+                nuevo_producto['codigo'] = codigo
+                print(f"\n⚠️  El código generado fue asignado a otro producto; nuevo código: {codigo}")
+            
+            guardado = self.confirmar_productos(self.productos + [nuevo_producto])
+            if guardado:
+                self.log_accion(f"Producto registrado: {codigo}", "Usuario")
+                self.publicar_cambio('insert', nuevo_producto)
         
-        if self.guardar_datos():
+        if guardado:
             print(f"\n🎉 PRODUCTO REGISTRADO EXITOSAMENTE!")
             print(f"📋 Código: {codigo}")
             print(f"📦 Producto: {nuevo_producto['nombre']}")
             print(f"🏷️  Categoría: {categoria}")
             print(f"💰 Margen de ganancia: ${nuevo_producto['precio_venta'] - nuevo_producto['precio_compra']:.2f}")
-            self.log_accion(f"Producto registrado: {codigo}", "Usuario")
         else:
             print("\n❌ Error al guardar el producto.")
         
@@ -284,6 +459,11 @@ class SistemaEmbalajes:
             if clave not in ['codigo', 'fecha_registro']:
                 print(f"  {clave.replace('_', ' ').title()}: {valor}")
         
+        estaba_bajo = self.stock_bajo(producto)
+        # Se edita una copia: la versión publicada sigue estable para los lectores
+        original = producto
+        producto = dict(producto)
+        
         print("\n🔄 INGRESE LOS NUEVOS VALORES (deje vacío para mantener):")
         
         # Campos editables
@@ -321,92 +501,399 @@ class SistemaEmbalajes:
         producto['fecha_modificacion'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         producto['modificado_por'] = "Usuario"
         
-        if self.guardar_datos():
+        with self.lock_escritura:
+            candidato = self.reemplazar_producto(original, producto)
+            vigente = candidato is not None
+            guardado = vigente and self.confirmar_productos(candidato)
+            if guardado:
+                self.log_accion(f"Producto modificado: {producto['codigo']}", "Usuario")
+                self.publicar_cambio('update', producto, estaba_bajo)
+        
+        if not vigente:
+            print("\n⚠️  El producto fue modificado o eliminado por otro usuario mientras se editaba.")
+            print("   No se guardaron los cambios; vuelva a abrirlo para editar la versión actual.")
+        elif guardado:
             print(f"\n✅ PRODUCTO ACTUALIZADO EXITOSAMENTE!")
-            self.log_accion(f"Producto modificado: {producto['codigo']}", "Usuario")
         else:
             print("\n❌ Error al guardar los cambios.")
         
         input("\n⏎ Presione Enter para continuar...")
     
+    def eliminar_producto(self, codigo: str) -> bool:
+        """Elimina un producto por código y publica el cambio"""
+        with self.lock_escritura:
+            producto = next((p for p in self.productos if p['codigo'] == codigo), None)
+            if not producto:
+                return False
+            
+            if not self.confirmar_productos([p for p in self.productos if p is not producto]):
+                return False
+            
+            self.log_accion(f"Producto eliminado: {codigo}", "Usuario")
+            self.publicar_cambio('delete', producto)
+        return True
+    
+    def eliminar_producto_interactivo(self):
+        """Elimina un producto seleccionado por el usuario, previa confirmación"""
+        self.mostrar_encabezado("ELIMINACIÓN DE PRODUCTO")
+        
+        producto = self.buscar_producto()
+        if not producto:
+            input("\n⏎ Presione Enter para continuar...")
+            return
+        
+        self.mostrar_detalle_producto(producto)
+        confirmar = input(f"\n¿Está seguro de eliminar {producto['codigo']}? "
+                          f"Esta acción no se puede deshacer (S/N): ").lower()
+        
+        if confirmar != 's':
+            print("\n↩️  Eliminación cancelada.")
+        elif self.eliminar_producto(producto['codigo']):
+            print(f"\n✅ PRODUCTO ELIMINADO EXITOSAMENTE!")
+        else:
+            print("\n❌ No se pudo eliminar el producto.")
+        
+        input("\n⏎ Presione Enter para continuar...")
+    
+    def cargar_conteo_stock(self, archivo: str) -> Dict[str, int]:
+        """Lee un conteo físico en CSV (codigo,stock) y devuelve {codigo: stock}"""
+        conteo = {}
+        with open(archivo, 'r', newline='', encoding='utf-8') as f:
+            for linea, fila in enumerate(csv.reader(f), 1):
+                # Se omiten encabezados y filas sin un código BOX-XXX-XXXX
+                if len(fila) < 2 or not self.validar_codigo_producto(fila[0].strip()):
+                    continue
+                
+                codigo, cantidad = fila[0].strip(), fila[1].strip()
+                try:
+                    stock = int(cantidad)
+                except ValueError:
+                    raise ValueError(f"Línea {linea}: cantidad no válida para {codigo}: '{cantidad}'")
+                if stock < 0:
+                    raise ValueError(f"Línea {linea}: cantidad negativa para {codigo}: {stock}")
+                conteo[codigo] = stock
+        return conteo
+    
+    def validar_cambio_lote(self, cambio: Dict):
+        """Verifica una operación de lote antes de aplicar nada; lanza ValueError si no es válida"""
+        operacion = cambio.get('operacion')
+        if operacion not in ['ajustar_porcentaje', 'establecer', 'margen_objetivo']:
+            raise ValueError(f"Operación de lote no válida: {operacion}")
+        
+        if not isinstance(cambio.get('filtro', {}), dict):
+            raise ValueError(f"{operacion}: 'filtro' debe ser un diccionario {{campo: valor}}")
+        
+        def numero(clave: str, valor) -> float:
+            if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+                raise ValueError(f"{operacion}: '{clave}' debe ser numérico, se recibió {valor!r}")
+            return valor
+        
+        if operacion == 'margen_objetivo':
+            if 'margen' not in cambio:
+                raise ValueError("margen_objetivo: falta 'margen'")
+            # Por debajo de -100% el precio de venta resultante sería negativo
+            if numero('margen', cambio['margen']) < -100:
+                raise ValueError(f"margen_objetivo: 'margen' no puede ser menor que -100 ({cambio['margen']})")
+            return
+        
+        campo = cambio.get('campo')
+        if campo not in self.campos_numericos_lote:
+            raise ValueError(f"{operacion}: campo no permitido {campo!r}; "
+                             f"use uno de {', '.join(self.campos_numericos_lote)}")
+        
+        if operacion == 'ajustar_porcentaje':
+            if 'porcentaje' not in cambio:
+                raise ValueError("ajustar_porcentaje: falta 'porcentaje'")
+            if numero('porcentaje', cambio['porcentaje']) < -100:
+                raise ValueError(f"ajustar_porcentaje: 'porcentaje' no puede ser menor que -100 "
+                                 f"({cambio['porcentaje']})")
+            return
+        
+        if ('valor' in cambio) == ('valores' in cambio):
+            raise ValueError("establecer: indique exactamente uno de 'valor' o 'valores'")
+        if 'valores' in cambio and not isinstance(cambio['valores'], dict):
+            raise ValueError("establecer: 'valores' debe ser un diccionario {codigo: valor}")
+        
+        valores = cambio['valores'].values() if 'valores' in cambio else [cambio['valor']]
+        for valor in valores:
+            if numero('valor', valor) < 0:
+                raise ValueError(f"establecer: {campo} no puede ser negativo ({valor})")
+            if campo in ['stock', 'stock_minimo'] and not isinstance(valor, int):
+                raise ValueError(f"establecer: {campo} debe ser un número entero ({valor})")
+    
+    def calcular_cambio_lote(self, producto: Dict, cambio: Dict, pendientes: Dict) -> None:
+        """Calcula el nuevo valor que una operación de lote asigna a un producto"""
+        operacion = cambio['operacion']
+        actual = {**producto, **pendientes}
+        
+        if operacion == 'ajustar_porcentaje':
+            campo = cambio['campo']
+            valor = actual[campo] * (1 + cambio['porcentaje'] / 100)
+            pendientes[campo] = int(round(valor)) if campo in ['stock', 'stock_minimo'] else round(valor, 2)
+        elif operacion == 'establecer':
+            campo = cambio['campo']
+            if 'valores' in cambio:
+                if producto['codigo'] not in cambio['valores']:
+                    return
+                valor = cambio['valores'][producto['codigo']]
+            else:
+                valor = cambio['valor']
+            pendientes[campo] = valor
+        elif operacion == 'margen_objetivo':
+            pendientes['precio_venta'] = round(actual['precio_compra'] * (1 + cambio['margen'] / 100), 2)
+    
+    def aplicar_lote(self, cambios: List[Dict], simular: bool = False,
+                     usuario: str = "Usuario") -> Dict:
+        """
+        Aplica un lote de cambios en una sola pasada, con un único guardado y una entrada de log.
+        
+        Cada cambio es un dict con 'operacion' y un 'filtro' opcional ({campo: valor}):
+          - ajustar_porcentaje: {'campo': 'precio_compra', 'porcentaje': 7}
+          - establecer: {'campo': 'stock', 'valores': {codigo: valor}} o {'campo': ..., 'valor': ...}
+          - margen_objetivo: {'margen': 40} recalcula precio_venta sobre precio_compra
+        
+        Solo se aceptan los campos numéricos de campos_numericos_lote; cualquier operación
+        inválida lanza ValueError antes de modificar nada. Con simular=True solo devuelve las
+        diferencias sin modificar el catálogo; los códigos de 'valores' que no existen en el
+        catálogo se informan en 'codigos_desconocidos'.
+        """
+        for cambio in cambios:
+            self.validar_cambio_lote(cambio)
+        
+        inicio = time.perf_counter()
+        with self.lock_escritura:
+            resultado = self.aplicar_lote_bloqueado(cambios, simular, usuario)
+        
+        duracion = time.perf_counter() - inicio
+        resultado['segundos'] = duracion
+        resultado['productos_por_segundo'] = (resultado['productos_revisados'] / duracion
+                                              if duracion > 0 else 0)
+        return resultado
+    
+    def aplicar_lote_bloqueado(self, cambios: List[Dict], simular: bool, usuario: str) -> Dict:
+        """Calcula y publica el lote; se ejecuta con lock_escritura adquirido"""
+        anteriores = self.productos
+        nuevos = []
+        modificados = []
+        diferencias = []
+        fecha = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        for producto in anteriores:
+            pendientes = {}
+            for cambio in cambios:
+                filtro = cambio.get('filtro', {})
+                if all(producto.get(campo) == valor for campo, valor in filtro.items()):
+                    self.calcular_cambio_lote(producto, cambio, pendientes)
+            
+            pendientes = {c: v for c, v in pendientes.items() if producto.get(c) != v}
+            if not pendientes:
+                nuevos.append(producto)
+                continue
+            
+            for campo, valor in pendientes.items():
+                diferencias.append({
+                    'codigo': producto['codigo'],
+                    'campo': campo,
+                    'anterior': producto.get(campo),
+                    'nuevo': valor
+                })
+            nuevo = {**producto, **pendientes, 'fecha_modificacion': fecha, 'modificado_por': usuario}
+            nuevos.append(nuevo)
+            modificados.append((nuevo, self.stock_bajo(producto)))
+        
+        codigos = {p['codigo'] for p in anteriores}
+        desconocidos = {c for cambio in cambios for c in cambio.get('valores', {}) if c not in codigos}
+        
+        resultado = {
+            'simulado': simular,
+            'productos_revisados': len(anteriores),
+            'productos_modificados': len(modificados),
+            'diferencias': diferencias,
+            'codigos_desconocidos': sorted(desconocidos),
+            'guardado': False
+        }
+        
+        if simular or not modificados:
+            return resultado
+        
+        if not self.confirmar_productos(nuevos):
+            return resultado
+        
+        resultado['guardado'] = True
+        self.log_accion(f"Lote aplicado: {len(cambios)} operaciones, "
+                        f"{len(modificados)} productos, "
+                        f"{len(diferencias)} campos modificados", usuario)
+        for producto, estaba_bajo in modificados:
+            self.publicar_cambio('update', producto, estaba_bajo)
+        return resultado
+    
+    def actualizar_por_lote_interactivo(self):
+        """Actualización masiva de precios o stock: simula, muestra las diferencias y pide confirmación"""
+        self.mostrar_encabezado("ACTUALIZACIÓN POR LOTE")
+        
+        print("\n📑 TIPOS DE ACTUALIZACIÓN:")
+        print("   1. Ajustar precio de compra (%) por proveedor")
+        print("   2. Establecer stock desde archivo de conteo (CSV codigo,stock)")
+        print("   3. Recalcular precio de venta a un margen objetivo (%)")
+        print("-" * 50)
+        
+        try:
+            tipo = int(input("\nSeleccione el tipo de actualización (1-3): "))
+            
+            if tipo == 1:
+                proveedor = input("Proveedor (vacío = todos): ").strip()
+                cambio = {'operacion': 'ajustar_porcentaje', 'campo': 'precio_compra',
+                          'porcentaje': float(input("Porcentaje de ajuste (ej: 7 o -5): "))}
+                if proveedor:
+                    cambio['filtro'] = {'proveedor': proveedor}
+            elif tipo == 2:
+                archivo = input("Ruta del archivo de conteo: ").strip()
+                cambio = {'operacion': 'establecer', 'campo': 'stock',
+                          'valores': self.cargar_conteo_stock(archivo)}
+            elif tipo == 3:
+                categoria = input("Categoría (vacío = todas): ").strip()
+                cambio = {'operacion': 'margen_objetivo',
+                          'margen': float(input("Margen objetivo sobre el precio de compra (%): "))}
+                if categoria:
+                    cambio['filtro'] = {'categoria': categoria}
+            else:
+                print("⚠️  Opción no válida.")
+                input("\n⏎ Presione Enter para continuar...")
+                return
+            
+            simulacion = self.aplicar_lote([cambio], simular=True)
+        except (ValueError, OSError) as e:
+            print(f"\n❌ {e}")
+            input("\n⏎ Presione Enter para continuar...")
+            return
+        
+        print(f"\n🔎 VISTA PREVIA ({simulacion['productos_modificados']} de "
+              f"{simulacion['productos_revisados']} productos cambiarían):")
+        print("-" * 70)
+        print(f"{'Código':<14} {'Campo':<15} {'Anterior':>15} {'Nuevo':>15}")
+        print("-" * 70)
+        for diferencia in simulacion['diferencias']:
+            print(f"{diferencia['codigo']:<14} {diferencia['campo']:<15} "
+                  f"{diferencia['anterior']!s:>15} {diferencia['nuevo']!s:>15}")
+        print("-" * 70)
+        
+        if simulacion['codigos_desconocidos']:
+            print(f"⚠️  Códigos no encontrados en el catálogo: "
+                  f"{', '.join(simulacion['codigos_desconocidos'])}")
+        
+        if not simulacion['diferencias']:
+            print("\n📭 No hay cambios que aplicar.")
+        elif input("\n¿Aplicar estos cambios? (S/N): ").lower() == 's':
+            resultado = self.aplicar_lote([cambio])
+            if resultado['guardado']:
+                print(f"\n✅ LOTE APLICADO: {resultado['productos_modificados']} productos actualizados "
+                      f"({resultado['productos_por_segundo']:,.0f} productos/s)")
+            else:
+                print("\n❌ Error al guardar los cambios.")
+        else:
+            print("\n↩️  Actualización cancelada.")
+        
+        input("\n⏎ Presione Enter para continuar...")
+    
     def generar_reporte_inventario(self):
         """Genera reporte detallado del inventario"""
         self.mostrar_encabezado("REPORTE DE INVENTARIO")
+        version, productos = self.instantanea()
         
-        if not self.productos:
+        if not productos:
             print("\n📭 No hay productos registrados.")
             input("\n⏎ Presione Enter para continuar...")
             return
         
-        # Estadísticas
-        total_productos = len(self.productos)
-        valor_total_inventario = 0
-        productos_bajo_stock = 0
-        categorias_distribucion = {}
+        print(self.cache_reportes.obtener('inventario_consola', (), version,
+                                          lambda: self.renderizar_reporte_inventario(version, productos)))
         
-        print("\n📊 REPORTE DETALLADO DE INVENTARIO")
-        print("=" * 120)
-        print(f"{'Código':<12} {'Producto':<25} {'Categoría':<20} {'U.Med':<8} "
-              f"{'P.Compra':<10} {'P.Venta':<10} {'Stock':<8} {'Valor':<12} {'Estado':<10}")
-        print("=" * 120)
+        print(f"\n📅 Fecha del reporte: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+        print(f"💾 Los datos se guardan automáticamente en '{self.archivo_datos}'")
         
-        for producto in self.productos:
-            valor_producto = producto['precio_compra'] * producto['stock']
-            valor_total_inventario += valor_producto
+        # Opción para exportar
+        exportar = input("\n¿Desea exportar este reporte a CSV? (S/N): ").lower()
+        if exportar == 's':
+            self.exportar_reporte_csv()
+        
+        input("\n⏎ Presione Enter para continuar...")
+    
+    def calcular_resumen_inventario(self, version: int, productos: List[Dict]) -> Dict:
+        """Calcula (con memoización) los totales del inventario y su distribución por categoría"""
+        def calcular():
+            categorias = {}
+            for producto in productos:
+                cat = producto['categoria']
+                if cat not in categorias:
+                    categorias[cat] = {'cantidad': 0, 'valor': 0}
+                categorias[cat]['cantidad'] += 1
+                categorias[cat]['valor'] += producto['precio_compra'] * producto['stock']
             
-            # Contar por categoría
-            cat = producto['categoria']
-            categorias_distribucion[cat] = categorias_distribucion.get(cat, 0) + 1
+            return {
+                'total_productos': len(productos),
+                'valor_total_inventario': sum(d['valor'] for d in categorias.values()),
+                'productos_bajo_stock': len([p for p in productos if self.stock_bajo(p)]),
+                'margen_promedio': self.calcular_margen_promedio(productos),
+                'categorias': categorias
+            }
+        
+        return self.cache_reportes.obtener('resumen', (), version, calcular)
+    
+    def renderizar_reporte_inventario(self, version: int, productos: List[Dict]) -> str:
+        """Construye el texto de la tabla y el resumen del reporte de inventario"""
+        resumen = self.calcular_resumen_inventario(version, productos)
+        total_productos = resumen['total_productos']
+        lineas = []
+        
+        lineas.append("\n📊 REPORTE DETALLADO DE INVENTARIO")
+        lineas.append("=" * 120)
+        lineas.append(f"{'Código':<12} {'Producto':<25} {'Categoría':<20} {'U.Med':<8} "
+                      f"{'P.Compra':<10} {'P.Venta':<10} {'Stock':<8} {'Valor':<12} {'Estado':<10}")
+        lineas.append("=" * 120)
+        
+        for producto in productos:
+            valor_producto = producto['precio_compra'] * producto['stock']
             
             # Estado del stock
             if producto['stock'] == 0:
                 estado = "AGOTADO 🔴"
-                productos_bajo_stock += 1
             elif producto['stock'] <= producto['stock_minimo']:
                 estado = "BAJO 🟡"
-                productos_bajo_stock += 1
             else:
                 estado = "NORMAL 🟢"
             
-            margen = producto['precio_venta'] - producto['precio_compra']
-            
-            print(f"{producto['codigo']:<12} {producto['nombre'][:23]:<25} "
-                  f"{producto['categoria'][:18]:<20} {producto.get('unidad_medida', 'N/A'):<8} "
-                  f"${producto['precio_compra']:<9.2f} ${producto['precio_venta']:<9.2f} "
-                  f"{producto['stock']:<8} ${valor_producto:<11.2f} {estado:<10}")
+            lineas.append(f"{producto['codigo']:<12} {producto['nombre'][:23]:<25} "
+                          f"{producto['categoria'][:18]:<20} {producto.get('unidad_medida', 'N/A'):<8} "
+                          f"${producto['precio_compra']:<9.2f} ${producto['precio_venta']:<9.2f} "
+                          f"{producto['stock']:<8} ${valor_producto:<11.2f} {estado:<10}")
         
-        print("=" * 120)
+        lineas.append("=" * 120)
         
         # Resumen ejecutivo
-        print(f"\n📈 RESUMEN EJECUTIVO:")
-        print(f"   • Total de productos: {total_productos}")
-        print(f"   • Valor total del inventario: ${valor_total_inventario:,.2f}")
-        print(f"   • Productos con stock bajo/crítico: {productos_bajo_stock}")
-        print(f"   • Margen de ganancia promedio: {self.calcular_margen_promedio():.1f}%")
-        
-        print(f"\n📦 DISTRIBUCIÓN POR CATEGORÍA:")
-        for categoria, cantidad in categorias_distribucion.items():
+        lineas.append(f"\n📈 RESUMEN EJECUTIVO:")
+        lineas.append(f"   • Total de productos: {total_productos}")
+        lineas.append(f"   • Valor total del inventario: ${resumen['valor_total_inventario']:,.2f}")
+        lineas.append(f"   • Productos con stock bajo/crítico: {resumen['productos_bajo_stock']}")
+        lineas.append(f"   • Margen de ganancia promedio: {resumen['margen_promedio']:.1f}%")
+        
+        lineas.append(f"\n📦 DISTRIBUCIÓN POR CATEGORÍA:")
+        for categoria, datos in resumen['categorias'].items():
+            cantidad = datos['cantidad']
             porcentaje = (cantidad / total_productos) * 100
             barra = "█" * int(porcentaje / 2)
-            print(f"   {categoria[:15]:<15} [{barra:<50}] {cantidad:>3} ({porcentaje:.1f}%)")
-        
-        print(f"\n📅 Fecha del reporte: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
-        print(f"💾 Los datos se guardan automáticamente en '{self.archivo_datos}'")
-        
-        # Opción para exportar
-        exportar = input("\n¿Desea exportar este reporte a CSV? (S/N): ").lower()
-        if exportar == 's':
-            self.exportar_reporte_csv()
+            lineas.append(f"   {categoria[:15]:<15} [{barra:<50}] {cantidad:>3} ({porcentaje:.1f}%)")
         
-        input("\n⏎ Presione Enter para continuar...")
+        return "\n".join(lineas)
     
-    def calcular_margen_promedio(self) -> float:
+    def calcular_margen_promedio(self, productos: Optional[List[Dict]] = None) -> float:
         """Calcula el margen de ganancia promedio"""
-        if not self.productos:
+        if productos is None:
+            _, productos = self.instantanea()
+        if not productos:
             return 0
         
         margenes = []
-        for producto in self.productos:
+        for producto in productos:
             if producto['precio_compra'] > 0:
                 margen = ((producto['precio_venta'] - producto['precio_compra']) / 
                          producto['precio_compra']) * 100
@@ -416,7 +903,8 @@ class SistemaEmbalajes:
     
     def exportar_reporte_csv(self):
         """Exporta el inventario a archivo CSV"""
-        if not self.productos:
+        version, productos = self.instantanea()
+        if not productos:
             print("\n📭 No hay productos para exportar.")
             return
         
@@ -424,44 +912,15 @@ class SistemaEmbalajes:
         nombre_archivo = f"reporte_inventario_{fecha_actual}.csv"
         
         try:
+            contenido = self.cache_reportes.obtener(
+                'inventario_csv', (), version, lambda: self.renderizar_csv_inventario(version, productos))
             with open(nombre_archivo, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
                 
                 # Encabezados
                 writer.writerow(['REPORTE DE INVENTARIO - BOXPRO SOLUTIONS'])
                 writer.writerow([f'Fecha de generación: {datetime.now().strftime("%d/%m/%Y %H:%M:%S")}'])
-                writer.writerow([])
-                writer.writerow([
-                    'Código', 'Nombre', 'Categoría', 'Unidad Medida', 'Precio Compra',
-                    'Precio Venta', 'Stock', 'Stock Mínimo', 'Valor Inventario',
-                    'Proveedor', 'Ubicación', 'Estado'
-                ])
-                
-                # Datos
-                for producto in self.productos:
-                    valor_inventario = producto['precio_compra'] * producto['stock']
-                    estado = "NORMAL" if producto['stock'] > producto['stock_minimo'] else "BAJO"
-                    estado = "AGOTADO" if producto['stock'] == 0 else estado
-                    
-                    writer.writerow([
-                        producto['codigo'],
-                        producto['nombre'],
-                        producto['categoria'],
-                        producto.get('unidad_medida', 'N/A'),
-                        producto['precio_compra'],
-                        producto['precio_venta'],
-                        producto['stock'],
-                        producto['stock_minimo'],
-                        valor_inventario,
-                        producto.get('proveedor', 'N/A'),
-                        producto.get('ubicacion', 'N/A'),
-                        estado
-                    ])
-                
-                # Totales
-                writer.writerow([])
-                total_valor = sum(p['precio_compra'] * p['stock'] for p in self.productos)
-                writer.writerow(['', '', '', '', '', '', '', 'TOTAL INVENTARIO:', f'${total_valor:.2f}'])
+                f.write(contenido)
             
             print(f"\n✅ Reporte exportado exitosamente a '{nombre_archivo}'")
             self.log_accion(f"Reporte exportado: {nombre_archivo}", "Sistema")
@@ -469,10 +928,50 @@ class SistemaEmbalajes:
         except Exception as e:
             print(f"\n❌ Error al exportar: {e}")
     
+    def renderizar_csv_inventario(self, version: int, productos: List[Dict]) -> str:
+        """Genera el cuerpo CSV del inventario (tabla y totales)"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        
+        writer.writerow([])
+        writer.writerow([
+            'Código', 'Nombre', 'Categoría', 'Unidad Medida', 'Precio Compra',
+            'Precio Venta', 'Stock', 'Stock Mínimo', 'Valor Inventario',
+            'Proveedor', 'Ubicación', 'Estado'
+        ])
+        
+        # Datos
+        for producto in productos:
+            valor_inventario = producto['precio_compra'] * producto['stock']
+            estado = "NORMAL" if producto['stock'] > producto['stock_minimo'] else "BAJO"
+            estado = "AGOTADO" if producto['stock'] == 0 else estado
+            
+            writer.writerow([
+                producto['codigo'],
+                producto['nombre'],
+                producto['categoria'],
+                producto.get('unidad_medida', 'N/A'),
+                producto['precio_compra'],
+                producto['precio_venta'],
+                producto['stock'],
+                producto['stock_minimo'],
+                valor_inventario,
+                producto.get('proveedor', 'N/A'),
+                producto.get('ubicacion', 'N/A'),
+                estado
+            ])
+        
+        # Totales
+        writer.writerow([])
+        total_valor = self.calcular_resumen_inventario(version, productos)['valor_total_inventario']
+        writer.writerow(['', '', '', '', '', '', '', 'TOTAL INVENTARIO:', f'${total_valor:.2f}'])
+        return buffer.getvalue()
+    
     def mostrar_alerta_stock(self):
         """Muestra productos con stock bajo"""
+        _, productos = self.instantanea()
         productos_bajo_stock = [
-            p for p in self.productos 
+            p for p in productos 
             if p['stock'] <= p['stock_minimo']
         ]
         
@@ -507,11 +1006,13 @@ class SistemaEmbalajes:
             print("   5. 📈 Estadísticas de ventas")
             print("   6. 🖨️  Exportar datos a Excel")
             print("   7. 📋 Ver log del sistema")
-            print("   8. 🚪 Salir del sistema")
+            print("   8. 🗑️  Eliminar producto")
+            print("   9. 📑 Actualizar precios/stock por lote")
+            print("  10. 🚪 Salir del sistema")
             print("-" * 70)
             
             try:
-                opcion = int(input("\nSeleccione una opción (1-8): "))
+                opcion = int(input("\nSeleccione una opción (1-10): "))
                 
                 if opcion == 1:
                     self.introducir_producto()
@@ -528,6 +1029,10 @@ class SistemaEmbalajes:
                 elif opcion == 7:
                     self.ver_log_sistema()
                 elif opcion == 8:
+                    self.eliminar_producto_interactivo()
+                elif opcion == 9:
+                    self.actualizar_por_lote_interactivo()
+                elif opcion == 10:
                     print("\n👋 ¡Gracias por usar el sistema BoxPro Solutions!")
                     print("   Sistema desarrollado para gestión profesional de embalajes.")
                     break
@@ -603,38 +1108,42 @@ class SistemaEmbalajes:
     def mostrar_estadisticas(self):
         """Muestra estadísticas del sistema"""
         self.mostrar_encabezado("ESTADÍSTICAS DEL SISTEMA")
+        version, productos = self.instantanea()
         
-        if not self.productos:
+        if not productos:
             print("\n📭 No hay datos para mostrar estadísticas.")
             input("\n⏎ Presione Enter para continuar...")
             return
         
-        total_productos = len(self.productos)
-        valor_total_inventario = sum(p['precio_compra'] * p['stock'] for p in self.productos)
-        productos_bajo_stock = len([p for p in self.productos if p['stock'] <= p['stock_minimo']])
+        print(self.cache_reportes.obtener('estadisticas_consola', (), version,
+                                          lambda: self.renderizar_estadisticas(version, productos)))
         
-        print("\n📊 ESTADÍSTICAS GENERALES:")
-        print(f"   • Total de productos registrados: {total_productos}")
-        print(f"   • Valor total del inventario: ${valor_total_inventario:,.2f}")
-        print(f"   • Productos con stock bajo: {productos_bajo_stock}")
-        print(f"   • Margen de ganancia promedio: {self.calcular_margen_promedio():.1f}%")
+        cache = self.cache_reportes.estadisticas()
+        print(f"\n💾 Caché de reportes: {cache['aciertos']} aciertos / {cache['fallos']} fallos "
+              f"({cache['entradas']}/{cache['capacidad']} entradas)")
         
-        # Estadísticas por categoría
-        print("\n📦 ESTADÍSTICAS POR CATEGORÍA:")
-        categorias = {}
-        for producto in self.productos:
-            cat = producto['categoria']
-            if cat not in categorias:
-                categorias[cat] = {'cantidad': 0, 'valor': 0}
-            categorias[cat]['cantidad'] += 1
-            categorias[cat]['valor'] += producto['precio_compra'] * producto['stock']
+        input("\n⏎ Presione Enter para continuar...")
+    
+    def renderizar_estadisticas(self, version: int, productos: List[Dict]) -> str:
+        """Construye el texto de las estadísticas generales y por categoría"""
+        resumen = self.calcular_resumen_inventario(version, productos)
+        total_productos = resumen['total_productos']
+        lineas = []
+        
+        lineas.append("\n📊 ESTADÍSTICAS GENERALES:")
+        lineas.append(f"   • Total de productos registrados: {total_productos}")
+        lineas.append(f"   • Valor total del inventario: ${resumen['valor_total_inventario']:,.2f}")
+        lineas.append(f"   • Productos con stock bajo: {resumen['productos_bajo_stock']}")
+        lineas.append(f"   • Margen de ganancia promedio: {resumen['margen_promedio']:.1f}%")
         
-        for categoria, datos in categorias.items():
+        # Estadísticas por categoría
+        lineas.append("\n📦 ESTADÍSTICAS POR CATEGORÍA:")
+        for categoria, datos in resumen['categorias'].items():
             porcentaje = (datos['cantidad'] / total_productos) * 100
-            print(f"   • {categoria}: {datos['cantidad']} productos ({porcentaje:.1f}%) - "
-                  f"Valor: ${datos['valor']:,.2f}")
+            lineas.append(f"   • {categoria}: {datos['cantidad']} productos ({porcentaje:.1f}%) - "
+                          f"Valor: ${datos['valor']:,.2f}")
         
-        input("\n⏎ Presione Enter para continuar...")
+        return "\n".join(lineas)
     
     def ver_log_sistema(self):
         """Muestra el log del sistema"""
@@ -663,6 +1172,94 @@ class SistemaEmbalajes:
         input("\n⏎ Presione Enter para continuar...")
 
 
+class ManejadorFeed(BaseHTTPRequestHandler):
+    """Expone el catálogo y el feed de cambios (Server-Sent Events) por HTTP"""
+    
+    sistema: SistemaEmbalajes = None
+    intervalo_keepalive = 15.0
+    
+    def enviar_cabeceras(self, codigo: int, tipo_contenido: str):
+        """Envía la línea de estado y las cabeceras comunes"""
+        self.send_response(codigo)
+        self.send_header('Content-Type', tipo_contenido)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+    
+    def do_GET(self):
+        """Atiende /api/productos y /api/cambios"""
+        url = urlparse(self.path)
+        
+        if url.path == '/api/productos':
+            # La secuencia se lee antes que la instantánea: a lo sumo se reenvían eventos ya aplicados
+            secuencia = self.sistema.feed.secuencia
+            version, productos = self.sistema.instantanea()
+            datos = self.sistema.cache_reportes.obtener(
+                'productos_json', (secuencia,), version,
+                lambda: json.dumps({'secuencia': secuencia, 'productos': productos},
+                                   ensure_ascii=False, default=str).encode('utf-8'))
+            self.enviar_cabeceras(200, 'application/json; charset=utf-8')
+            self.wfile.write(datos)
+        elif url.path == '/api/cambios':
+            self.transmitir_cambios(url)
+        else:
+            self.enviar_cabeceras(404, 'application/json; charset=utf-8')
+            self.wfile.write(b'{"error": "Recurso no encontrado"}')
+    
+    def transmitir_cambios(self, url):
+        """Transmite eventos desde Last-Event-ID (o ?desde=) hasta que el cliente se desconecte"""
+        ultimo_id = self.headers.get('Last-Event-ID') or parse_qs(url.query).get('desde', ['0'])[0]
+        try:
+            ultimo_id = int(ultimo_id)
+        except ValueError:
+            ultimo_id = 0
+        
+        self.enviar_cabeceras(200, 'text/event-stream; charset=utf-8')
+        feed = self.sistema.feed
+        
+        try:
+            while True:
+                eventos = feed.eventos_desde(ultimo_id)
+                if eventos is None:
+                    # El cliente quedó fuera del buffer: debe recargar el catálogo completo
+                    ultimo_id = feed.secuencia
+                    self.wfile.write(f"id: {ultimo_id}\nevent: reset\ndata: {{}}\n\n".encode('utf-8'))
+                    eventos = []
+                
+                for evento in eventos:
+                    datos = json.dumps(evento, ensure_ascii=False, default=str)
+                    self.wfile.write(f"id: {evento['id']}\nevent: {evento['tipo']}\n"
+                                     f"data: {datos}\n\n".encode('utf-8'))
+                    ultimo_id = evento['id']
+                
+                self.wfile.flush()
+                if not feed.esperar(ultimo_id, self.intervalo_keepalive):
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+    
+    def log_message(self, formato, *args):
+        """Omite el registro de cada petición (no ensucia la consola del menú ni el log)"""
+        pass
+
+    def log_error(self, formato, *args):
+        """Registra solo los errores HTTP en el log del sistema"""
+        self.sistema.log_accion(f"Error HTTP: {formato % args}", "Servidor")
+
+
+def iniciar_servidor_feed(sistema: SistemaEmbalajes, host: str = "localhost",
+                          puerto: int = 5000) -> ThreadingHTTPServer:
+    """Inicia el servidor del feed de cambios en un hilo en segundo plano"""
+    manejador = type('ManejadorFeedSistema', (ManejadorFeed,), {'sistema': sistema})
+    servidor = ThreadingHTTPServer((host, puerto), manejador)
+    servidor.daemon_threads = True
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    sistema.log_accion(f"Servidor de cambios iniciado en http://{host}:{puerto}/api/cambios")
+    return servidor
+
+
 # Punto de entrada del programa
 if __name__ == "__main__":
     print("=" * 70)
@@ -721,8 +1318,12 @@ if __name__ == "__main__":
                 'estado': 'Activo'
             }
         ]
-        sistema.productos = datos_ejemplo
-        sistema.guardar_datos()
+        with sistema.lock_escritura:
+            sistema.confirmar_productos(datos_ejemplo)
+    
+    if "--servidor" in sys.argv:
+        iniciar_servidor_feed(sistema)
+        print("   Feed de cambios disponible en http://localhost:5000/api/cambios")
     
     print("   Sistema listo. Presione Enter para continuar...")
     input()